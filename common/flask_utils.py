@@ -0,0 +1,55 @@
+import os
+
+from flask import abort, request
+from flask.json.provider import DefaultJSONProvider
+
+from common.serialization import dumps, loads
+
+# Largest request body accepted by MCP components (bytes)
+MAX_REQUEST_BYTES = int(os.environ.get('MAX_REQUEST_BYTES', 10 * 1024 * 1024))
+
+# Methods whose requests carry a JSON body
+BODY_METHODS = frozenset(('POST', 'PUT', 'PATCH'))
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that parses and serializes with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        """Serialize an object to a JSON string."""
+        return dumps(obj, default=self.default, sort_keys=self.sort_keys).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        """Deserialize a JSON request body."""
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response from raw serialized bytes."""
+        obj = self._prepare_response_obj(args, kwargs)
+        body = dumps(obj, default=self.default, sort_keys=self.sort_keys)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+
+def reject_invalid_body():
+    """Reject non-JSON or oversized bodies before they are read or parsed."""
+    if request.method not in BODY_METHODS:
+        return None
+
+    if not request.is_json:
+        abort(415)
+
+    content_length = request.content_length
+    if content_length is not None and content_length > MAX_REQUEST_BYTES:
+        abort(413)
+
+    return None
+
+
+def init_app(app):
+    """Install the MCP JSON provider and request guard on a Flask app."""
+    app.json = ORJSONProvider(app)
+
+    # Also enforced by Werkzeug while streaming bodies without Content-Length
+    app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+    app.before_request(reject_invalid_body)
+    return app
@@ -0,0 +1,23 @@
+import time
+from random import getrandbits
+
+
+def next_id():
+    """Generate a time-ordered UUIDv7 string.
+
+    The top 48 bits hold the Unix time in milliseconds and the 12 bits
+    after the version nibble hold the sub-millisecond fraction, so IDs
+    sort lexicographically by creation time. The remaining 62 bits come
+    from the module-level PRNG (seeded once, reseeded after fork) rather
+    than an os.urandom() call per ID.
+    """
+    ms, sub_ms = divmod(time.time_ns(), 1_000_000)
+    value = (
+        (ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76
+        | (sub_ms * 4096 // 1_000_000) << 64
+        | 0x2 << 62
+        | getrandbits(62)
+    )
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
@@ -31,6 +31,10 @@ class MCPLogger:
             handler.setFormatter(formatter)
             self.logger.addHandler(handler)
 
+    def isEnabledFor(self, level):
+        """Check whether messages at the given logging level would be emitted."""
+        return self.logger.isEnabledFor(level)
+
     def _format_log(self, level, message, data=None):
         """Format a log message."""
         log_obj = {
@@ -47,16 +51,20 @@ class MCPLogger:
 
     def error(self, message, data=None):
         """Log an error message."""
-        self.logger.error(self._format_log('ERROR', message, data))
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(self._format_log('ERROR', message, data))
 
     def warn(self, message, data=None):
         """Log a warning message."""
-        self.logger.warning(self._format_log('WARN', message, data))
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(self._format_log('WARN', message, data))
 
     def info(self, message, data=None):
         """Log an info message."""
-        self.logger.info(self._format_log('INFO', message, data))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(self._format_log('INFO', message, data))
 
     def debug(self, message, data=None):
         """Log a debug message."""
-        self.logger.debug(self._format_log('DEBUG', message, data))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(self._format_log('DEBUG', message, data))
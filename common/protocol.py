@@ -2,6 +2,7 @@ import uuid
 import json
 from datetime import datetime
 
+
 class MCPProtocol:
     """MCP Protocol implementation for creating and validating messages."""
 
@@ -47,7 +48,8 @@ class MCPProtocol:
     @staticmethod
     def create_notification(type_name, data, **options):
         """Create a notification object."""
-        notification_id = options.get('id', f"notif-{uuid.uuid4()}")
+        # Only generate an ID when the caller did not pass one
+        notification_id = options['id'] if 'id' in options else f"notif-{uuid.uuid4()}"
         source = options.get('source', 'mcp-server')
         metadata = options.get('metadata', {})
 
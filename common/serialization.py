@@ -0,0 +1,47 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+# Runs of 19+ digits may be integers beyond 64 bits, which orjson would
+# parse as floats; documents containing one are parsed by the json module
+_LONG_DIGITS = re.compile(r'\d{19}')
+_LONG_DIGITS_BYTES = re.compile(rb'\d{19}')
+
+# NumPy values are emitted directly; int/float dict keys match the json module
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+
+def dumps(obj, default=None, sort_keys=False):
+    """Serialize an object to compact JSON bytes.
+
+    Uses orjson when it is installed, which also serializes NumPy arrays
+    and scalars natively, and falls back to the standard library otherwise.
+    Non-string dict keys are converted to strings in both cases. Values
+    orjson rejects, such as integers beyond 64 bits, go through the
+    standard library so they are serialized exactly.
+    """
+    if orjson is not None:
+        option = ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else ORJSON_OPTIONS
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj, separators=(',', ':'), default=default, sort_keys=sort_keys).encode('utf-8')
+
+
+def loads(data):
+    """Parse a JSON document from bytes or str.
+
+    Uses orjson's C parser when it is installed and falls back to the
+    standard library otherwise. Documents with a 19+ digit number always
+    use the standard library so large integers keep their exact value.
+    """
+    if orjson is not None:
+        pattern = _LONG_DIGITS if isinstance(data, str) else _LONG_DIGITS_BYTES
+        if pattern.search(data) is None:
+            return orjson.loads(data)
+    return json.loads(data)
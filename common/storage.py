@@ -0,0 +1,197 @@
+import contextlib
+import sqlite3
+import threading
+
+from common.serialization import dumps, loads
+
+
+class ShardedStore:
+    """Dict-like in-memory store split across lock-striped shards.
+
+    Keys are assigned to one of ``shard_count`` dicts by hash, each guarded
+    by its own RLock. Single-key reads go straight to the shard dict (atomic
+    under the GIL); writers that need a read-modify-write sequence hold
+    ``lock_for(key)`` so unrelated keys never contend on one mutex.
+    """
+
+    # Contents are private to this process
+    shared = False
+
+    def __init__(self, shard_count=16):
+        """Initialize the store."""
+        if shard_count < 1 or shard_count & (shard_count - 1):
+            raise ValueError("Shard count must be a power of two")
+
+        self._mask = shard_count - 1
+        self._shards = [{} for _ in range(shard_count)]
+        self._locks = [threading.RLock() for _ in range(shard_count)]
+
+    def lock_for(self, key):
+        """Get the lock guarding the shard that owns a key."""
+        return self._locks[hash(key) & self._mask]
+
+    def get(self, key, default=None):
+        """Get a value by key."""
+        return self._shards[hash(key) & self._mask].get(key, default)
+
+    def __contains__(self, key):
+        return key in self._shards[hash(key) & self._mask]
+
+    def __getitem__(self, key):
+        return self._shards[hash(key) & self._mask][key]
+
+    def __setitem__(self, key, value):
+        index = hash(key) & self._mask
+        with self._locks[index]:
+            self._shards[index][key] = value
+
+    def __delitem__(self, key):
+        index = hash(key) & self._mask
+        with self._locks[index]:
+            del self._shards[index][key]
+
+    def __len__(self):
+        return sum(len(shard) for shard in self._shards)
+
+    def keys(self):
+        """Get a snapshot of all keys."""
+        return [key for shard in self._shards for key in list(shard)]
+
+    def values(self):
+        """Get a snapshot of all values."""
+        return [value for shard in self._shards for value in list(shard.values())]
+
+    def items(self):
+        """Get a snapshot of all (key, value) pairs."""
+        return [item for shard in self._shards for item in list(shard.items())]
+
+
+class SQLiteStore:
+    """Dict-like store persisted to a SQLite table in WAL mode.
+
+    Exposes the same interface as ShardedStore so managers can switch
+    between in-memory and durable storage. Values are stored as JSON
+    blobs; reads return fresh copies, so callers must assign a modified
+    value back to persist it. WAL journaling lets several worker
+    processes read the same file while one writes.
+    """
+
+    # Contents may be changed by other processes using the same file
+    shared = True
+
+    def __init__(self, db_path, table):
+        """Initialize the store and create its table if needed."""
+        self.db_path = db_path
+        self.table = table
+        self._local = threading.local()
+        self._lock = threading.RLock()
+
+        self._connection().execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+
+    def _connection(self):
+        """Get this thread's connection, opening it on first use."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.db_path, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _encode_key(key):
+        return dumps(key).decode('utf-8')
+
+    @staticmethod
+    def _decode_key(raw):
+        key = loads(raw)
+        return tuple(key) if isinstance(key, list) else key
+
+    @contextlib.contextmanager
+    def lock_for(self, key):
+        """Run a read-modify-write sequence in one write transaction.
+
+        The RLock orders threads in this process; BEGIN IMMEDIATE takes
+        SQLite's write lock up front, so workers in other processes sharing
+        the file wait instead of interleaving and losing updates. Nested
+        uses on one thread join the outer transaction.
+        """
+        with self._lock:
+            connection = self._connection()
+            depth = getattr(self._local, 'depth', 0)
+            if depth == 0:
+                connection.execute('BEGIN IMMEDIATE')
+            self._local.depth = depth + 1
+
+            try:
+                yield
+            except BaseException:
+                self._local.depth = depth
+                if depth == 0:
+                    connection.execute('ROLLBACK')
+                raise
+
+            self._local.depth = depth
+            if depth == 0:
+                connection.execute('COMMIT')
+
+    def get(self, key, default=None):
+        """Get a value by key."""
+        row = self._connection().execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (self._encode_key(key),)
+        ).fetchone()
+        return default if row is None else loads(row[0])
+
+    def __contains__(self, key):
+        row = self._connection().execute(
+            f"SELECT 1 FROM {self.table} WHERE key = ?", (self._encode_key(key),)
+        ).fetchone()
+        return row is not None
+
+    def __getitem__(self, key):
+        row = self._connection().execute(
+            f"SELECT value FROM {self.table} WHERE key = ?", (self._encode_key(key),)
+        ).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return loads(row[0])
+
+    def __setitem__(self, key, value):
+        self._connection().execute(
+            f"INSERT OR REPLACE INTO {self.table} (key, value) VALUES (?, ?)",
+            (self._encode_key(key), dumps(value))
+        )
+
+    def __delitem__(self, key):
+        cursor = self._connection().execute(
+            f"DELETE FROM {self.table} WHERE key = ?", (self._encode_key(key),)
+        )
+        if cursor.rowcount == 0:
+            raise KeyError(key)
+
+    def __len__(self):
+        return self._connection().execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def keys(self):
+        """Get all keys."""
+        rows = self._connection().execute(f"SELECT key FROM {self.table}")
+        return [self._decode_key(raw) for (raw,) in rows]
+
+    def values(self):
+        """Get all values."""
+        rows = self._connection().execute(f"SELECT value FROM {self.table}")
+        return [loads(raw) for (raw,) in rows]
+
+    def items(self):
+        """Get all (key, value) pairs."""
+        rows = self._connection().execute(f"SELECT key, value FROM {self.table}")
+        return [(self._decode_key(raw_key), loads(raw)) for raw_key, raw in rows]
+
+
+def open_store(db_path, table):
+    """Open a SQLite-backed store when a path is configured, else an in-memory one."""
+    if db_path:
+        return SQLiteStore(db_path, table)
+    return ShardedStore()
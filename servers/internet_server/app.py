@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
+from common.flask_utils import init_app
 from internet import InternetConnector
 
 # Initialize logger
@@ -16,6 +17,7 @@ logger = MCPLogger(service_name='internet-server')
 
 # Create Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5005))
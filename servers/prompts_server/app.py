@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
+from common.flask_utils import init_app
 from prompts import PromptsManager
 
 # Initialize logger
@@ -16,16 +17,18 @@ logger = MCPLogger(service_name='prompts-server')
 
 # Create Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5007))
 SERVER_ID = os.environ.get('SERVER_ID', '7')
 CAPABILITIES = os.environ.get('CAPABILITIES', 'prompts').split(',')
+DB_PATH = os.environ.get('PROMPTS_DB_PATH')
 
 logger.info(f"Initializing MCP Server {SERVER_ID} with capabilities: {', '.join(CAPABILITIES)}")
 
 # Initialize prompts manager
-prompts_manager = PromptsManager()
+prompts_manager = PromptsManager(db_path=DB_PATH)
 
 
 # Process request endpoint
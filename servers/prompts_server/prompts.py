@@ -1,12 +1,13 @@
 import os
 import sys
 import json
-import uuid
 import re
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from common.logging_utils import MCPLogger
+from common.ids import next_id
+from common.storage import open_store
 from common.error_handling import ResourceError
 
 logger = MCPLogger(service_name='prompts-server')
@@ -15,11 +16,27 @@ logger = MCPLogger(service_name='prompts-server')
 class PromptsManager:
     """Prompts manager for MCP Prompts Server."""
 
-    def __init__(self):
-        """Initialize the prompts manager."""
-        self.prompts = {}
-        self.templates = {}
+    def __init__(self, db_path=None):
+        """Initialize the prompts manager.
+
+        When db_path is given, prompts and templates are persisted to that
+        SQLite file; otherwise they are kept in memory.
+        """
+        self.prompts = open_store(db_path, 'prompts')
+        self.templates = open_store(db_path, 'templates')
         self.categories = set()
+        # Prompt ID -> frozenset of tags, kept out of the returned prompt dicts.
+        # Only trusted for in-memory stores; a shared SQLite file may be
+        # changed by other processes, so tags and categories are then read
+        # from the stored records instead.
+        self._tag_sets = {}
+
+        # Rebuild derived state from persisted data
+        for prompt in self.prompts.values():
+            self.categories.add(prompt['category'])
+            self._tag_sets[prompt['id']] = frozenset(prompt['tags'])
+        for template in self.templates.values():
+            self.categories.add(template['category'])
 
     def create_prompt(self, prompt_data):
         """Create a new prompt."""
@@ -31,7 +48,7 @@ class PromptsManager:
             raise ValueError("Prompt text and title are required")
 
         # Generate prompt ID
-        prompt_id = str(uuid.uuid4())
+        prompt_id = next_id()
 
         # Optional fields
         description = prompt_data.get('description', '')
@@ -54,6 +71,7 @@ class PromptsManager:
 
         # Store the prompt
         self.prompts[prompt_id] = prompt
+        self._tag_sets[prompt_id] = frozenset(tags)
 
         # Track category
         self.categories.add(category)
@@ -71,19 +89,24 @@ class PromptsManager:
 
     def update_prompt(self, prompt_id, updates):
         """Update a prompt."""
-        if prompt_id not in self.prompts:
-            raise ResourceError(f"Prompt not found: {prompt_id}")
+        with self.prompts.lock_for(prompt_id):
+            if prompt_id not in self.prompts:
+                raise ResourceError(f"Prompt not found: {prompt_id}")
+
+            prompt = self.prompts[prompt_id]
 
-        prompt = self.prompts[prompt_id]
+            # Apply updates
+            updatable_fields = ['title', 'text', 'description', 'category', 'tags', 'metadata']
+            for field in updatable_fields:
+                if field in updates:
+                    prompt[field] = updates[field]
 
-        # Apply updates
-        updatable_fields = ['title', 'text', 'description', 'category', 'tags', 'metadata']
-        for field in updatable_fields:
-            if field in updates:
-                prompt[field] = updates[field]
+            if 'tags' in updates:
+                self._tag_sets[prompt_id] = frozenset(updates['tags'])
 
-        # Update timestamp
-        prompt['updated'] = datetime.utcnow().isoformat()
+            # Update timestamp
+            prompt['updated'] = datetime.utcnow().isoformat()
+            self.prompts[prompt_id] = prompt
 
         # Update category tracking if changed
         if 'category' in updates:
@@ -94,11 +117,13 @@ class PromptsManager:
 
     def delete_prompt(self, prompt_id):
         """Delete a prompt."""
-        if prompt_id not in self.prompts:
-            raise ResourceError(f"Prompt not found: {prompt_id}")
+        with self.prompts.lock_for(prompt_id):
+            if prompt_id not in self.prompts:
+                raise ResourceError(f"Prompt not found: {prompt_id}")
 
-        # Remove the prompt
-        del self.prompts[prompt_id]
+            # Remove the prompt
+            del self.prompts[prompt_id]
+            self._tag_sets.pop(prompt_id, None)
 
         logger.info(f"Deleted prompt {prompt_id}")
         return {'id': prompt_id, 'deleted': True}
@@ -107,6 +132,17 @@ class PromptsManager:
         """List prompts with optional filtering."""
         filtered_prompts = []
 
+        # Prepare filter values once rather than per prompt
+        filter_tags = None
+        search_term = None
+        if filters:
+            if 'tags' in filters:
+                filter_tags = frozenset(filters['tags'])
+            if 'search' in filters:
+                search_term = filters['search'].lower()
+
+        tag_sets = None if self.prompts.shared else self._tag_sets
+
         # Apply filters
         for prompt in self.prompts.values():
             if filters:
@@ -115,15 +151,15 @@ class PromptsManager:
                     continue
 
                 # Filter by tags (any match)
-                if 'tags' in filters:
-                    filter_tags = set(filters['tags'])
-                    prompt_tags = set(prompt['tags'])
-                    if not filter_tags.intersection(prompt_tags):
+                if filter_tags is not None:
+                    tags = tag_sets.get(prompt['id']) if tag_sets is not None else None
+                    if tags is None:
+                        tags = frozenset(prompt['tags'])
+                    if filter_tags.isdisjoint(tags):
                         continue
 
                 # Filter by search term
-                if 'search' in filters:
-                    search_term = filters['search'].lower()
+                if search_term is not None:
                     if (search_term not in prompt['title'].lower() and
                             search_term not in prompt['description'].lower() and
                             search_term not in prompt['text'].lower()):
@@ -151,6 +187,11 @@ class PromptsManager:
 
     def get_categories(self):
         """Get all prompt categories."""
+        if self.prompts.shared:
+            categories = {prompt['category'] for prompt in self.prompts.values()}
+            categories.update(template['category'] for template in self.templates.values())
+            return list(categories)
+
         return list(self.categories)
 
     # Template Management
@@ -165,7 +206,7 @@ class PromptsManager:
             raise ValueError("Template text and name are required")
 
         # Generate template ID
-        template_id = str(uuid.uuid4())
+        template_id = next_id()
 
         # Parse variables in template
         variables = self._extract_template_variables(template_text)
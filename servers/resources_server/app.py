@@ -9,12 +9,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
+from common.flask_utils import init_app
 
 # Initialize logger
 logger = MCPLogger(service_name='resources-server')
 
 # Create Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5001))
@@ -1,10 +1,11 @@
-import uuid
 from datetime import datetime
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from common.logging_utils import MCPLogger
+from common.ids import next_id
+from common.storage import open_store
 from common.error_handling import ResourceError
 
 logger = MCPLogger(service_name='resources-server')
@@ -13,14 +14,18 @@ logger = MCPLogger(service_name='resources-server')
 class ResourceManager:
     """Resource management for MCP Resources Server."""
 
-    def __init__(self):
-        """Initialize the resource manager."""
-        self.resources = {}
-        self.resource_types = set()
+    def __init__(self, db_path=None):
+        """Initialize the resource manager.
+
+        When db_path is given, resources are persisted to that SQLite file;
+        otherwise they are kept in memory.
+        """
+        self.resources = open_store(db_path, 'resources')
+        self.resource_types = {resource_type for resource_type, _ in self.resources.keys()}
 
     def get_resource(self, resource_type, resource_id):
         """Retrieve a resource."""
-        resource_key = f"{resource_type}/{resource_id}"
+        resource_key = (resource_type, resource_id)
 
         if resource_key not in self.resources:
             # For development, create mock resources on demand
@@ -30,7 +35,7 @@ class ResourceManager:
 
     def create_resource(self, resource_type, resource_data):
         """Create a new resource."""
-        resource_id = str(uuid.uuid4())
+        resource_id = next_id()
 
         # Create the resource object
         resource = {
@@ -42,38 +47,42 @@ class ResourceManager:
         }
 
         # Store the resource
-        resource_key = f"{resource_type}/{resource_id}"
+        resource_key = (resource_type, resource_id)
         self.resources[resource_key] = resource
         self.resource_types.add(resource_type)
 
-        logger.info(f"Created resource {resource_key}")
+        logger.info(f"Created resource {resource_type}/{resource_id}")
         return resource
 
     def update_resource(self, resource_type, resource_id, resource_data):
         """Update an existing resource."""
-        resource_key = f"{resource_type}/{resource_id}"
+        resource_key = (resource_type, resource_id)
 
-        if resource_key not in self.resources:
-            raise ResourceError(f"Resource {resource_key} not found")
+        with self.resources.lock_for(resource_key):
+            if resource_key not in self.resources:
+                raise ResourceError(f"Resource {resource_type}/{resource_id} not found")
 
-        # Update the resource
-        self.resources[resource_key].update(resource_data)
-        self.resources[resource_key]['updated'] = datetime.utcnow().isoformat()
+            # Update the resource
+            resource = self.resources[resource_key]
+            resource.update(resource_data)
+            resource['updated'] = datetime.utcnow().isoformat()
+            self.resources[resource_key] = resource
 
-        logger.info(f"Updated resource {resource_key}")
-        return self.resources[resource_key]
+        logger.info(f"Updated resource {resource_type}/{resource_id}")
+        return resource
 
     def delete_resource(self, resource_type, resource_id):
         """Delete a resource."""
-        resource_key = f"{resource_type}/{resource_id}"
+        resource_key = (resource_type, resource_id)
 
-        if resource_key not in self.resources:
-            raise ResourceError(f"Resource {resource_key} not found")
+        with self.resources.lock_for(resource_key):
+            if resource_key not in self.resources:
+                raise ResourceError(f"Resource {resource_type}/{resource_id} not found")
 
-        # Remove the resource
-        del self.resources[resource_key]
+            # Remove the resource
+            del self.resources[resource_key]
 
-        logger.info(f"Deleted resource {resource_key}")
+        logger.info(f"Deleted resource {resource_type}/{resource_id}")
         return True
 
     def list_resources(self, resource_type=None, limit=100, offset=0):
@@ -81,8 +90,8 @@ class ResourceManager:
         if resource_type:
             # Filter by resource type
             filtered_resources = [
-                resource for key, resource in self.resources.items()
-                if key.startswith(f"{resource_type}/")
+                resource for (key_type, _), resource in self.resources.items()
+                if key_type == resource_type
             ]
         else:
             # All resources
@@ -100,6 +109,10 @@ class ResourceManager:
 
     def get_resource_types(self):
         """Get all registered resource types."""
+        if self.resources.shared:
+            # Other processes may have added types to the shared file
+            return list({resource_type for resource_type, _ in self.resources.keys()})
+
         return list(self.resource_types)
 
     def _create_mock_resource(self, resource_type, resource_id):
@@ -118,17 +131,17 @@ class ResourceManager:
         }
 
         # Store the resource
-        resource_key = f"{resource_type}/{resource_id}"
+        resource_key = (resource_type, resource_id)
         self.resources[resource_key] = resource
         self.resource_types.add(resource_type)
 
-        logger.info(f"Created mock resource {resource_key}")
+        logger.info(f"Created mock resource {resource_type}/{resource_id}")
         return resource
 
     def process_llm_response(self, prompt, response):
         """Process an LLM response."""
         # Create a record of the LLM interaction
-        interaction_id = str(uuid.uuid4())
+        interaction_id = next_id()
 
         # Process the response (could implement post-processing logic here)
         processed_response = response.strip()
@@ -148,11 +161,11 @@ class ResourceManager:
         }
 
         # Store the interaction
-        resource_key = f"llm-interaction/{interaction_id}"
+        resource_key = ('llm-interaction', interaction_id)
         self.resources[resource_key] = interaction
         self.resource_types.add('llm-interaction')
 
-        logger.info(f"Processed LLM response, created resource {resource_key}")
+        logger.info(f"Processed LLM response, created resource llm-interaction/{interaction_id}")
 
         return {
             'prompt': prompt,
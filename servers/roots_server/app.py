@@ -9,6 +9,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
+from common.flask_utils import init_app
 from roots import RootsManager
 
 # Initialize logger
@@ -16,16 +17,18 @@ logger = MCPLogger(service_name='roots-server')
 
 # Create Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5006))
 SERVER_ID = os.environ.get('SERVER_ID', '6')
 CAPABILITIES = os.environ.get('CAPABILITIES', 'roots').split(',')
+DB_PATH = os.environ.get('ROOTS_DB_PATH')
 
 logger.info(f"Initializing MCP Server {SERVER_ID} with capabilities: {', '.join(CAPABILITIES)}")
 
 # Initialize roots manager
-roots_manager = RootsManager()
+roots_manager = RootsManager(db_path=DB_PATH)
 
 
 # Process request endpoint
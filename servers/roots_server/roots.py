@@ -1,11 +1,12 @@
 import os
 import sys
 import json
-import uuid
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from common.logging_utils import MCPLogger
+from common.ids import next_id
+from common.storage import open_store
 from common.error_handling import ResourceError, AuthenticationError
 
 logger = MCPLogger(service_name='roots-server')
@@ -14,9 +15,13 @@ logger = MCPLogger(service_name='roots-server')
 class RootsManager:
     """Roots manager for MCP Roots Server."""
 
-    def __init__(self):
-        """Initialize the roots manager."""
-        self.roots = {}
+    def __init__(self, db_path=None):
+        """Initialize the roots manager.
+
+        When db_path is given, roots are persisted to that SQLite file;
+        otherwise they are kept in memory.
+        """
+        self.roots = open_store(db_path, 'roots')
         self.operations = {
             'create': self.create_root,
             'get': self.get_root,
@@ -27,11 +32,11 @@ class RootsManager:
 
     def execute_operation(self, operation, params):
         """Execute a root operation."""
-        if operation not in self.operations:
+        op = self.operations.get(operation)
+        if op is None:
             raise ValueError(f"Unsupported operation: {operation}")
 
-        logger.info(f"Executing root operation: {operation}")
-        return self.operations[operation](params)
+        return op(params)
 
     def create_root(self, params):
         """Create a new root."""
@@ -43,7 +48,7 @@ class RootsManager:
             raise ValueError("Name and type are required for root creation")
 
         # Generate a unique root ID
-        root_id = str(uuid.uuid4())
+        root_id = next_id()
 
         # Create the root object
         root = {
@@ -83,19 +88,21 @@ class RootsManager:
         if not root_id or not updates:
             raise ValueError("Root ID and updates are required")
 
-        if root_id not in self.roots:
-            raise ResourceError(f"Root not found: {root_id}")
+        with self.roots.lock_for(root_id):
+            if root_id not in self.roots:
+                raise ResourceError(f"Root not found: {root_id}")
 
-        # Update the root
-        root = self.roots[root_id]
+            # Update the root
+            root = self.roots[root_id]
 
-        # Apply updates
-        for key, value in updates.items():
-            if key in ['name', 'type', 'params', 'metadata']:
-                root[key] = value
+            # Apply updates
+            for key, value in updates.items():
+                if key in ['name', 'type', 'params', 'metadata']:
+                    root[key] = value
 
-        # Update timestamp
-        root['updated'] = datetime.utcnow().isoformat()
+            # Update timestamp
+            root['updated'] = datetime.utcnow().isoformat()
+            self.roots[root_id] = root
 
         logger.info(f"Updated root {root_id}")
         return root
@@ -107,11 +114,12 @@ class RootsManager:
         if not root_id:
             raise ValueError("Root ID is required")
 
-        if root_id not in self.roots:
-            raise ResourceError(f"Root not found: {root_id}")
+        with self.roots.lock_for(root_id):
+            if root_id not in self.roots:
+                raise ResourceError(f"Root not found: {root_id}")
 
-        # Remove the root
-        del self.roots[root_id]
+            # Remove the root
+            del self.roots[root_id]
 
         logger.info(f"Deleted root {root_id}")
         return {'id': root_id, 'deleted': True}
@@ -131,10 +139,10 @@ class RootsManager:
         else:
             filtered_roots = list(self.roots.values())
 
-        # Sort by creation time (newest first)
+        # Sort by creation time (newest first); IDs are time-ordered
         sorted_roots = sorted(
             filtered_roots,
-            key=lambda r: r['created'],
+            key=lambda r: r['id'],
             reverse=True
         )
 
@@ -1,6 +1,8 @@
 from flask import Flask, request, jsonify
 import json
 import os
+import concurrent.futures
+import multiprocessing
 import sys
 from datetime import datetime
 
@@ -9,24 +11,78 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
-from sampling import SamplingEngine
+from common.flask_utils import init_app
+from common.error_handling import TimeoutError as SamplingTimeoutError
+from sampling import SamplingEngine, init_worker, run_sampling, run_sampling_batch
 
 # Initialize logger
 logger = MCPLogger(service_name='sampling-server')
 
 # Create Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5002))
 SERVER_ID = os.environ.get('SERVER_ID', '2')
 CAPABILITIES = os.environ.get('CAPABILITIES', 'sampling').split(',')
+SAMPLING_WORKERS = int(os.environ.get('SAMPLING_WORKERS', os.cpu_count() or 1))
+SAMPLING_TIMEOUT = float(os.environ.get('SAMPLING_TIMEOUT', 30))
 
 logger.info(f"Initializing MCP Server {SERVER_ID} with capabilities: {', '.join(CAPABILITIES)}")
 
 # Initialize sampling engine
 sampling_engine = SamplingEngine()
 
+# Worker processes for sampling, so CPU-bound draws run outside this
+# process's GIL (SAMPLING_WORKERS=0 samples inline instead). Workers are
+# started from a clean server process rather than forked from this one,
+# which may already be running request threads holding locks.
+SAMPLING_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+sampling_pool = (
+    concurrent.futures.ProcessPoolExecutor(
+        max_workers=SAMPLING_WORKERS,
+        mp_context=multiprocessing.get_context(SAMPLING_START_METHOD),
+        initializer=init_worker
+    )
+    if SAMPLING_WORKERS > 0 else None
+)
+
+# Pool workers warm up in init_worker; only an inline engine needs it here
+if sampling_pool is None:
+    sampling_engine.warmup()
+
+
+def execute_sampling(method, params):
+    """Run a sampling call, in the worker pool when one is configured."""
+    if sampling_pool is None:
+        return sampling_engine.sample(method, params)
+
+    return wait_for_sampling(sampling_pool.submit(run_sampling, method, params))
+
+
+def execute_sampling_batch(specs):
+    """Run a batch sampling call, in the worker pool when one is configured."""
+    if sampling_pool is None:
+        return sampling_engine.sample_batch(specs)
+
+    return wait_for_sampling(sampling_pool.submit(run_sampling_batch, specs))
+
+
+def wait_for_sampling(future):
+    """Wait for a pooled sampling call, bounded by SAMPLING_TIMEOUT."""
+    try:
+        return future.result(timeout=SAMPLING_TIMEOUT)
+    except concurrent.futures.TimeoutError:
+        future.cancel()
+        raise SamplingTimeoutError(f"Sampling timed out after {SAMPLING_TIMEOUT}s")
+
+
+def add_iso_timestamp(result):
+    """Add an ISO 8601 'timestamp' derived from a result's 'timestamp_ns'."""
+    result['timestamp'] = datetime.utcfromtimestamp(result['timestamp_ns'] / 1e9).isoformat()
+    return result
+
 
 # Process request endpoint
 @app.route('/process', methods=['POST'])
@@ -51,7 +107,11 @@ def process_request():
             logger.info(f"Performing {method} sampling with params:", {'params': params})
 
             # Execute sampling
-            result = sampling_engine.sample(method, params)
+            result = execute_sampling(method, params)
+
+            # ISO timestamps are formatted only when the client asks for them
+            if request.args.get('iso_timestamp') == '1':
+                add_iso_timestamp(result)
 
             # Return success response
             response = MCPProtocol.create_response(
@@ -80,6 +140,56 @@ def process_request():
         return jsonify(error_response), 500
 
 
+# Batch sampling endpoint: many specs in one request, one result per spec
+@app.route('/sample_batch', methods=['POST'])
+def sample_batch():
+    request_data = request.json
+    logger.info(f"Server {SERVER_ID} received batch request:", {'requestId': request_data.get('id')})
+
+    try:
+        # Validate request
+        if not MCPProtocol.validate_message(request_data, 'request'):
+            raise ValueError('Invalid request format')
+
+        if request_data.get('type') != 'sampling-task':
+            raise ValueError(f"Unsupported request type for server {SERVER_ID}: {request_data.get('type')}")
+
+        specs = request_data.get('payload', {}).get('specs')
+        if not isinstance(specs, list) or not all(isinstance(spec, dict) for spec in specs):
+            raise ValueError("Batch sampling requires a list of {method, params} specs")
+
+        # Execute sampling
+        results = execute_sampling_batch(specs)
+
+        # ISO timestamps are formatted only when the client asks for them
+        if request.args.get('iso_timestamp') == '1':
+            for result in results:
+                add_iso_timestamp(result)
+
+        # Return success response
+        response = MCPProtocol.create_response(
+            request_data.get('id'),
+            'success',
+            {'results': results},
+            source=f"mcp-server-{SERVER_ID}"
+        )
+
+        return jsonify(response)
+
+    except Exception as e:
+        logger.error(f"Error processing batch request {request_data.get('id')}: {str(e)}")
+
+        # Return error response
+        error_response = MCPProtocol.create_response(
+            request_data.get('id'),
+            'error',
+            {'error': str(e)},
+            source=f"mcp-server-{SERVER_ID}"
+        )
+
+        return jsonify(error_response), 500
+
+
 # Health check endpoint
 @app.route('/health', methods=['GET'])
 def health_check():
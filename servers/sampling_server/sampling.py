@@ -1,20 +1,249 @@
 import numpy as np
+import base64
+import hashlib
 import json
+import threading
+import time
+from collections import OrderedDict
 import sys
 import os
-from datetime import datetime
+
+try:
+    import numba
+except ImportError:  # pragma: no cover - numba is optional
+    numba = None
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from common.logging_utils import MCPLogger
 
 logger = MCPLogger(service_name='sampling-server')
 
+# Candidate set size for the first nucleus pass; doubled until it covers p
+NUCLEUS_INITIAL_K = 64
+
+# Top-k/nucleus distributions memoized per engine
+DISTRIBUTION_CACHE_SIZE = 64
+
+# Per-process engine used by run_sampling in pool workers
+_worker_engine = None
+
+# Minimal inputs that exercise every sampling method once
+WARMUP_PARAMS = {
+    'uniform': {'size': 1},
+    'normal': {'size': 1},
+    'weighted': {'values': [0, 1], 'weights': [1, 1]},
+    'stratified': {'strata': {'warmup': [0]}, 'sample_sizes': {'warmup': 1}},
+    'topk': {'logits': [0.0, 1.0], 'k': 1},
+    'nucleus': {'logits': [0.0, 1.0]}
+}
+
+
+def _softmax(logits):
+    """Numerically stable softmax: exp(x - max(x)) normalized, one exp pass.
+
+    Probabilities are computed in float64 so cumulative sums stay accurate
+    over large vocabularies even when the logits are float32.
+    """
+    probs = np.exp(logits - np.max(logits), dtype=np.float64)
+    probs /= probs.sum()
+    return probs
+
+
+# Location/scale parameter names for the methods drawn as loc + scale * draw
+LOC_SCALE_PARAMS = {
+    'uniform': ('low', 'high'),
+    'normal': ('mean', 'std')
+}
+
+
+def _is_flat_draw(params, method):
+    """Whether a uniform/normal spec is a 1-D draw with scalar parameters.
+
+    Only these take the in-place and stacked fast paths; array-valued
+    parameters or a size of None or a shape tuple go through the
+    generator's own broadcasting.
+    """
+    first, second = LOC_SCALE_PARAMS[method]
+    return (isinstance(params.get('size', 1), int) and
+            isinstance(params.get(first, 0), (int, float)) and
+            isinstance(params.get(second, 1), (int, float)))
+
+
+def _gather(values, indices):
+    """Pick values at the sampled indices, shaped like the indices.
+
+    Lists are indexed directly, which costs O(len(indices)); converting them
+    to an array first would cost O(len(values)) on every call. NumPy arrays
+    and multi-dimensional draws are fancy-indexed instead.
+    """
+    # A size=None draw is a single index
+    if np.ndim(indices) == 0:
+        return values[int(indices)]
+
+    if indices.ndim == 1 and not isinstance(values, np.ndarray):
+        return [values[i] for i in indices.tolist()]
+
+    if not isinstance(values, np.ndarray):
+        values = np.fromiter(values, dtype=object, count=len(values))
+    return values[indices].tolist()
+
+
+# Top-k and nucleus distribution builders. Each returns the selected token
+# indices with their probabilities; the draw itself is a searchsorted on the
+# cumulative probabilities, so a cached distribution can be sampled again in
+# O(log n). With Numba installed the fused kernels below are compiled and
+# walk the logits a fixed number of times without NumPy temporaries.
+
+def _top_k_numpy(logits, k, temperature):
+    """Top-k indices (ascending logit) and their softmax probabilities."""
+    # Ranking is invariant under a positive temperature, so select on the raw
+    # logits and only scale the k survivors
+    if k < len(logits):
+        top_k_indices = np.argpartition(logits, -k)[-k:]
+    else:
+        top_k_indices = np.arange(len(logits))
+    top_k_indices = top_k_indices[np.argsort(logits[top_k_indices])]
+
+    top_k_logits = logits[top_k_indices]
+    if temperature > 0:
+        top_k_logits = top_k_logits / temperature
+
+    # Softmax over the top-k logits only
+    return top_k_indices, _softmax(top_k_logits)
+
+
+def _nucleus_numpy(logits, p, temperature):
+    """Nucleus indices (descending probability) and their probabilities."""
+    # Unnormalized exp weights: temperature is folded into the shifted logits
+    # and the normalizer is applied to the nucleus only, not the vocabulary
+    shifted = logits - np.max(logits)
+    if temperature > 0:
+        shifted *= 1.0 / temperature
+    weights = np.exp(shifted, dtype=np.float64)
+    total = weights.sum()
+    target_mass = p * total
+
+    # Partition out the k highest logits and sort only those, doubling k
+    # until their cumulative mass reaches p (amortized O(V))
+    vocab_size = len(weights)
+    k = min(NUCLEUS_INITIAL_K, vocab_size)
+    while True:
+        if k < vocab_size:
+            candidates = np.argpartition(logits, vocab_size - k)[vocab_size - k:]
+        else:
+            candidates = np.arange(vocab_size)
+
+        sorted_indices = candidates[np.argsort(-logits[candidates])]
+        cumulative_weights = np.cumsum(weights[sorted_indices])
+
+        if cumulative_weights[-1] >= target_mass or k == vocab_size:
+            break
+        k = min(k * 2, vocab_size)
+
+    # Smallest prefix whose cumulative mass reaches p
+    m = int(np.searchsorted(cumulative_weights, target_mass, side='left')) + 1
+    m = min(m, len(sorted_indices))
+    nucleus_indices = sorted_indices[:m]
+
+    return nucleus_indices, weights[nucleus_indices] / total
+
+
+def _top_indices(values, k):
+    """Indices of the k largest values, in descending order of value."""
+    n = values.shape[0]
+    if k >= n:
+        selected = np.arange(n)
+    else:
+        threshold = np.partition(values, n - k)[n - k]
+        selected = np.empty(k, dtype=np.int64)
+        count = 0
+        for i in range(n):
+            if values[i] > threshold:
+                selected[count] = i
+                count += 1
+        for i in range(n):
+            if count == k:
+                break
+            if values[i] == threshold:
+                selected[count] = i
+                count += 1
+    return selected[np.argsort(-values[selected])]
+
+
+def _top_k_kernel(logits, k, temperature):
+    """Fused top-k: select, then softmax over the k logits."""
+    top = _top_indices(logits, k)[::-1].copy()
+    inv_temperature = 1.0 / temperature if temperature > 0 else 1.0
+    peak = logits[top[-1]]
+
+    probs = np.empty(top.shape[0])
+    total = 0.0
+    for j in range(top.shape[0]):
+        weight = np.exp((logits[top[j]] - peak) * inv_temperature)
+        probs[j] = weight
+        total += weight
+    probs /= total
+
+    return top, probs
+
+
+def _nucleus_kernel(logits, p, temperature):
+    """Fused nucleus: smallest top set whose probability mass reaches p."""
+    n = logits.shape[0]
+    inv_temperature = 1.0 / temperature if temperature > 0 else 1.0
+
+    # Max, then unnormalized exp weights and their sum
+    peak = logits[0]
+    for i in range(1, n):
+        if logits[i] > peak:
+            peak = logits[i]
+
+    weights = np.empty(n)
+    total = 0.0
+    for i in range(n):
+        weight = np.exp((logits[i] - peak) * inv_temperature)
+        weights[i] = weight
+        total += weight
+
+    # Grow the candidate set by doubling until it holds mass p
+    target_mass = p * total
+    k = min(NUCLEUS_INITIAL_K, n)
+    while True:
+        order = _top_indices(weights, k)
+        mass = 0.0
+        size = k
+        for j in range(k):
+            mass += weights[order[j]]
+            if mass >= target_mass:
+                size = j + 1
+                break
+        if mass >= target_mass or k == n:
+            break
+        k = min(k * 2, n)
+
+    nucleus_indices = order[:size].copy()
+    return nucleus_indices, weights[nucleus_indices] / total
+
+
+if numba is not None:
+    _jit = numba.njit(cache=True, fastmath=True)
+    _top_indices = _jit(_top_indices)
+    _top_k_distribution = _jit(_top_k_kernel)
+    _nucleus_distribution = _jit(_nucleus_kernel)
+else:
+    _top_k_distribution = _top_k_numpy
+    _nucleus_distribution = _nucleus_numpy
+
 
 class SamplingEngine:
     """Sampling engine for MCP Sampling Server."""
 
     def __init__(self):
         """Initialize the sampling engine."""
+        # One PCG64 generator per thread (see rng), so concurrent requests never share state
+        self._local = threading.local()
+        self._distribution_cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.sampling_methods = {
             'uniform': self.uniform_sampling,
             'normal': self.normal_sampling,
@@ -24,6 +253,14 @@ class SamplingEngine:
             'nucleus': self.nucleus_sampling
         }
 
+    @property
+    def rng(self):
+        """PCG64-backed generator for the calling thread."""
+        rng = getattr(self._local, 'rng', None)
+        if rng is None:
+            rng = self._local.rng = np.random.default_rng()
+        return rng
+
     def sample(self, method, params):
         """Sample using the specified method and parameters."""
         if method not in self.sampling_methods:
@@ -32,20 +269,105 @@ class SamplingEngine:
         logger.info(f"Performing {method} sampling")
         return self.sampling_methods[method](params)
 
+    def sample_batch(self, specs):
+        """Sample for a list of {'method', 'params'} specs, one result per spec.
+
+        Uniform and normal specs with an integer size and scalar parameters
+        are drawn with a single generator call per method and split back
+        into per-spec results; everything else runs one spec at a time.
+        """
+        results = [None] * len(specs)
+        stacked = {'uniform': [], 'normal': []}
+
+        logger.info(f"Performing batch sampling for {len(specs)} specs")
+        for position, spec in enumerate(specs):
+            method = spec.get('method')
+            params = spec.get('params', {})
+            if method not in self.sampling_methods:
+                raise ValueError(f"Sampling method not supported: {method}")
+
+            if method in stacked and _is_flat_draw(params, method):
+                stacked[method].append(position)
+            else:
+                results[position] = self.sampling_methods[method](params)
+
+        timestamp_ns = time.time_ns()
+        for method, positions in stacked.items():
+            if not positions:
+                continue
+
+            params_list = [specs[position].get('params', {}) for position in positions]
+            sizes = np.array([params.get('size', 1) for params in params_list], dtype=np.intp)
+
+            # One draw for the whole group, then loc + scale * draw per segment
+            if method == 'uniform':
+                loc = np.array([params.get('low', 0) for params in params_list], dtype=np.float64)
+                scale = np.array([params.get('high', 1) for params in params_list], dtype=np.float64) - loc
+                samples = self.rng.random(sizes.sum())
+            else:
+                loc = np.array([params.get('mean', 0) for params in params_list], dtype=np.float64)
+                scale = np.array([params.get('std', 1) for params in params_list], dtype=np.float64)
+                samples = self.rng.standard_normal(sizes.sum())
+            samples *= np.repeat(scale, sizes)
+            samples += np.repeat(loc, sizes)
+
+            segments = np.split(samples, np.cumsum(sizes)[:-1])
+            for position, params, segment in zip(positions, params_list, segments):
+                results[position] = {
+                    'method': method,
+                    **self._encode_samples(segment, params),
+                    'params': params,
+                    'timestamp_ns': timestamp_ns
+                }
+
+        return results
+
+    def warmup(self):
+        """Run every sampling method once so the first real request is hot."""
+        for method, params in WARMUP_PARAMS.items():
+            self.sampling_methods[method](params)
+
+    def _encode_samples(self, samples, params):
+        """Encode a sample array for the response.
+
+        By default samples are returned as JSON (a list, or a number for a
+        scalar draw). With params['binary'] the raw buffer is returned
+        base64-encoded instead, optionally narrowed with params['dtype'] =
+        'float32', avoiding one Python float per sample.
+        """
+        samples = np.asarray(samples)
+        if not params.get('binary'):
+            return {'samples': samples.tolist()}
+
+        dtype = np.float32 if params.get('dtype') == 'float32' else np.float64
+        data = samples.astype(dtype, copy=False)
+        return {
+            'dtype': data.dtype.name,
+            'shape': list(data.shape),
+            'data_b64': base64.b64encode(data.tobytes()).decode('ascii')
+        }
+
     def uniform_sampling(self, params):
         """Uniform random sampling."""
         size = params.get('size', 1)
         low = params.get('low', 0)
         high = params.get('high', 1)
 
-        # Generate samples
-        samples = np.random.uniform(low, high, size)
+        if _is_flat_draw(params, 'uniform'):
+            # Generate samples in place: low + (high - low) * U[0, 1)
+            samples = np.empty(size)
+            self.rng.random(out=samples)
+            samples *= high - low
+            samples += low
+        else:
+            # Array-valued bounds or a non-integer size broadcast in the generator
+            samples = self.rng.uniform(low, high, size)
 
         return {
             'method': 'uniform',
-            'samples': samples.tolist(),
+            **self._encode_samples(samples, params),
             'params': params,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ns': time.time_ns()
         }
 
     def normal_sampling(self, params):
@@ -54,14 +376,21 @@ class SamplingEngine:
         mean = params.get('mean', 0)
         std = params.get('std', 1)
 
-        # Generate samples
-        samples = np.random.normal(mean, std, size)
+        if _is_flat_draw(params, 'normal'):
+            # Generate samples in place: mean + std * N(0, 1)
+            samples = np.empty(size)
+            self.rng.standard_normal(out=samples)
+            samples *= std
+            samples += mean
+        else:
+            # Array-valued parameters or a non-integer size broadcast in the generator
+            samples = self.rng.normal(mean, std, size)
 
         return {
             'method': 'normal',
-            'samples': samples.tolist(),
+            **self._encode_samples(samples, params),
             'params': params,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ns': time.time_ns()
         }
 
     def weighted_sampling(self, params):
@@ -73,19 +402,22 @@ class SamplingEngine:
         if not values or not weights or len(values) != len(weights):
             raise ValueError("Values and weights must be provided and have the same length")
 
-        # Normalize weights
-        weights_sum = sum(weights)
-        normalized_weights = [w / weights_sum for w in weights]
+        # Normalize weights in one vectorized pass
+        weights_array = np.asarray(weights, dtype=np.float64)
+        weights_sum = weights_array.sum()
+        if weights_sum <= 0:
+            raise ValueError("Weights must sum to a positive value")
+        normalized_weights = weights_array / weights_sum
 
         # Generate samples
-        samples_indices = np.random.choice(len(values), size=size, p=normalized_weights)
-        samples = [values[i] for i in samples_indices]
+        samples_indices = self.rng.choice(len(values), size=size, p=normalized_weights)
+        samples = _gather(values, samples_indices)
 
         return {
             'method': 'weighted',
             'samples': samples,
             'params': params,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ns': time.time_ns()
         }
 
     def stratified_sampling(self, params):
@@ -106,16 +438,51 @@ class SamplingEngine:
                 size = len(stratum_values)
 
             # Random sampling without replacement
-            sampled_indices = np.random.choice(len(stratum_values), size=size, replace=False)
-            samples[stratum_name] = [stratum_values[i] for i in sampled_indices]
+            sampled_indices = self.rng.choice(len(stratum_values), size=size, replace=False)
+            samples[stratum_name] = _gather(stratum_values, sampled_indices)
 
         return {
             'method': 'stratified',
             'samples': samples,
             'params': params,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ns': time.time_ns()
         }
 
+    def _distribution(self, method, logits_array, param, temperature):
+        """Get (indices, probabilities, cumulative) for a top-k/nucleus distribution.
+
+        Results are memoized in a small LRU keyed by a digest of the logits
+        plus the method parameters, so repeated draws from the same logits
+        skip selection and softmax entirely.
+        """
+        digest = hashlib.blake2b(logits_array.tobytes(), digest_size=16).digest()
+        key = (method, digest, logits_array.shape[0], param, temperature)
+
+        with self._cache_lock:
+            entry = self._distribution_cache.get(key)
+            if entry is not None:
+                self._distribution_cache.move_to_end(key)
+                return entry
+
+        if method == 'topk':
+            indices, probs = _top_k_distribution(logits_array, param, temperature)
+        else:
+            indices, probs = _nucleus_distribution(logits_array, param, temperature)
+        entry = (indices, probs, np.cumsum(probs))
+
+        with self._cache_lock:
+            self._distribution_cache[key] = entry
+            if len(self._distribution_cache) > DISTRIBUTION_CACHE_SIZE:
+                self._distribution_cache.popitem(last=False)
+
+        return entry
+
+    def _draw(self, indices, probs, cumulative):
+        """Inverse-CDF draw of one index from a (possibly unnormalized) distribution."""
+        position = int(np.searchsorted(cumulative, self.rng.random() * cumulative[-1], side='right'))
+        position = min(position, len(indices) - 1)
+        return indices[position], probs[position]
+
     def top_k_sampling(self, params):
         """Top-K sampling for text generation."""
         logits = params.get('logits', [])
@@ -125,33 +492,26 @@ class SamplingEngine:
         if not logits:
             raise ValueError("Logits must be provided")
 
-        # Convert logits to numpy array
-        logits_array = np.array(logits)
-
-        # Apply temperature
-        if temperature > 0:
-            logits_array = logits_array / temperature
+        if k <= 0:
+            raise ValueError("k must be a positive integer")
 
-        # Get top-k indices
-        top_k_indices = np.argsort(logits_array)[-k:]
+        # Contiguous float32 logits take NumPy's SIMD (x86-simd-sort) partition path
+        logits_array = np.ascontiguousarray(logits, dtype=np.float32)
 
-        # Set probabilities for top-k
-        probs = np.zeros_like(logits_array)
-        probs[top_k_indices] = np.exp(logits_array[top_k_indices])
-
-        # Normalize probabilities
-        probs = probs / np.sum(probs)
+        top_k_indices, top_k_probs, cumulative = self._distribution(
+            'topk', logits_array, int(k), float(temperature)
+        )
 
         # Sample from the distribution
-        sample_index = np.random.choice(len(logits), p=probs)
+        sample_index, sample_probability = self._draw(top_k_indices, top_k_probs, cumulative)
 
         return {
             'method': 'topk',
             'sample_index': int(sample_index),
-            'sample_probability': float(probs[sample_index]),
+            'sample_probability': float(sample_probability),
             'top_k_indices': top_k_indices.tolist(),
             'params': params,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ns': time.time_ns()
         }
 
     def nucleus_sampling(self, params):
@@ -163,45 +523,51 @@ class SamplingEngine:
         if not logits:
             raise ValueError("Logits must be provided")
 
-        # Convert logits to numpy array
-        logits_array = np.array(logits)
-
-        # Apply temperature
-        if temperature > 0:
-            logits_array = logits_array / temperature
-
-        # Convert to probabilities
-        probs = np.exp(logits_array) / np.sum(np.exp(logits_array))
+        # Contiguous float32 logits take NumPy's SIMD (x86-simd-sort) partition path
+        logits_array = np.ascontiguousarray(logits, dtype=np.float32)
 
-        # Sort in descending order
-        sorted_indices = np.argsort(-probs)
-        sorted_probs = probs[sorted_indices]
-
-        # Cumulative probabilities
-        cumulative_probs = np.cumsum(sorted_probs)
-
-        # Find the indices that are in the top-p
-        nucleus_indices = sorted_indices[cumulative_probs <= p]
-
-        # Include the first index after p if needed
-        if len(nucleus_indices) == 0 or cumulative_probs[0] > p:
-            nucleus_indices = np.array([sorted_indices[0]])
-        elif cumulative_probs[-1] < p:
-            nucleus_indices = np.append(nucleus_indices, sorted_indices[len(nucleus_indices)])
-
-        # Create a new distribution with only nucleus probabilities
-        nucleus_probs = probs[nucleus_indices]
-        nucleus_probs = nucleus_probs / np.sum(nucleus_probs)
+        nucleus_indices, nucleus_probs, cumulative = self._distribution(
+            'nucleus', logits_array, float(p), float(temperature)
+        )
 
         # Sample from the nucleus
-        sample_idx = np.random.choice(nucleus_indices, p=nucleus_probs)
+        sample_idx, sample_probability = self._draw(nucleus_indices, nucleus_probs, cumulative)
 
         return {
             'method': 'nucleus',
             'sample_index': int(sample_idx),
-            'sample_probability': float(probs[sample_idx]),
+            'sample_probability': float(sample_probability),
             'nucleus_size': len(nucleus_indices),
             'nucleus_indices': nucleus_indices.tolist(),
             'params': params,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp_ns': time.time_ns()
         }
+
+
+def init_worker():
+    """Build and warm up the engine for a pool worker process."""
+    global _worker_engine
+    _worker_engine = SamplingEngine()
+    _worker_engine.warmup()
+
+
+def _get_worker_engine():
+    """Get this process's engine, creating it on first use."""
+    global _worker_engine
+    if _worker_engine is None:
+        _worker_engine = SamplingEngine()
+    return _worker_engine
+
+
+def run_sampling(method, params):
+    """Run a sampling call on this process's engine.
+
+    Module-level so it can be submitted to a ProcessPoolExecutor; each
+    worker builds its engine once on first use.
+    """
+    return _get_worker_engine().sample(method, params)
+
+
+def run_sampling_batch(specs):
+    """Run a batch sampling call on this process's engine."""
+    return _get_worker_engine().sample_batch(specs)
@@ -1,7 +1,31 @@
 import json
 import csv
+import base64
 from io import StringIO
 
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - pandas is optional
+    pd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+
+def _parse_cell(value):
+    """Convert a CSV cell to int or float when it looks numeric."""
+    stripped = value.strip()
+    if stripped and stripped.replace('.', '', 1).isdigit():
+        try:
+            return float(value) if '.' in value else int(value)
+        except ValueError:
+            return value
+    return value
+
+
 class DataTransformer:
     """Data transformer tool for MCP."""
 
@@ -21,25 +45,48 @@ class DataTransformer:
 
         return output.getvalue()
 
+    def csv_to_arrow(self, csv_data):
+        """Convert CSV to a base64-encoded Arrow IPC stream.
+
+        Columns are parsed by Arrow's multithreaded reader straight into
+        typed columnar buffers; decode with pyarrow.ipc.open_stream.
+        """
+        if pa is None:
+            raise ValueError("pyarrow is required for csv_to_arrow")
+
+        if not csv_data.strip():
+            return ""
+
+        table = pacsv.read_csv(pa.BufferReader(csv_data.encode('utf-8')))
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        return base64.b64encode(sink.getvalue()).decode('ascii')
+
     def csv_to_json(self, csv_data):
         """Convert CSV to JSON."""
-        # Parse CSV
-        reader = csv.DictReader(StringIO(csv_data))
-
-        # Convert to list of dictionaries
-        result = []
-        for row in reader:
-            # Try to convert numeric values
-            processed_row = {}
-            for key, value in row.items():
-                if value.strip() and value.strip().replace('.', '', 1).isdigit():
-                    try:
-                        processed_row[key] = float(value) if '.' in value else int(value)
-                    except ValueError:
-                        processed_row[key] = value
-                else:
-                    processed_row[key] = value
-
-            result.append(processed_row)
-
-        return result
+        if pd is not None:
+            if not csv_data.strip():
+                return []
+
+            # Parse and infer column types in pandas' C parser. Nullable dtypes
+            # keep integer columns with gaps as ints, and only empty cells are
+            # missing (become None); text such as 'NA' or 'null' is kept as is.
+            df = pd.read_csv(
+                StringIO(csv_data),
+                dtype_backend='numpy_nullable',
+                keep_default_na=False,
+                na_values=['']
+            )
+            return df.astype(object).where(df.notna(), None).to_dict(orient='records')
+
+        # Parse CSV rows as lists; the header is the first non-empty row
+        reader = csv.reader(StringIO(csv_data))
+        headers = next((row for row in reader if row), None)
+        if headers is None:
+            return []
+
+        # Convert to list of dictionaries, trying numeric conversion per cell
+        return [dict(zip(headers, map(_parse_cell, row))) for row in reader if row]
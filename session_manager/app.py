@@ -2,6 +2,9 @@ from flask import Flask, request, jsonify, Response
 import json
 import uuid
 import time
+import heapq
+import logging
+import queue
 import threading
 import requests
 import os
@@ -13,6 +16,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
+from common.flask_utils import init_app
 from dispatcher import RequestDispatcher
 
 # Initialize logger
@@ -20,6 +24,7 @@ logger = MCPLogger(service_name='session-manager')
 
 # Create Flask app
 app = Flask(__name__)
+init_app(app)
 
 # Configuration
 PORT = int(os.environ.get('PORT', 5000))
@@ -39,9 +44,20 @@ dispatcher = RequestDispatcher(server_urls)
 # Active sessions storage
 sessions = {}
 
-# SSE clients for notifications
+# Seconds of inactivity after which a session expires
+SESSION_TIMEOUT = 1800
+
+# Min-heap of (expiry epoch, session ID). Activity only updates the session's
+# lastActivity; stale entries are re-armed or discarded when they are popped.
+session_expiry = []
+session_expiry_lock = threading.Lock()
+
+# SSE clients for notifications: client ID -> queue of pending notifications
 sse_clients = {}
 
+# Notifications buffered per SSE client before new ones are dropped
+SSE_QUEUE_SIZE = 1000
+
 # SESSION MANAGEMENT ENDPOINTS
 
 # Create a new session
@@ -54,14 +70,18 @@ def create_session():
         return jsonify({'error': 'Client ID is required'}), 400
 
     session_id = str(uuid.uuid4())
+    now = time.time()
     sessions[session_id] = {
         'id': session_id,
         'clientId': client_id,
-        'created': datetime.utcnow().isoformat(),
-        'lastActivity': datetime.utcnow().isoformat(),
+        'created': now,
+        'lastActivity': now,
         'activeRequests': {}
     }
 
+    with session_expiry_lock:
+        heapq.heappush(session_expiry, (now + SESSION_TIMEOUT, session_id))
+
     logger.info(f"Session {session_id} created for client {client_id}")
     return jsonify({'sessionId': session_id}), 201
 
@@ -75,8 +95,8 @@ def get_session(session_id):
     return jsonify({
         'id': session['id'],
         'clientId': session['clientId'],
-        'created': session['created'],
-        'lastActivity': session['lastActivity'],
+        'created': datetime.utcfromtimestamp(session['created']).isoformat(),
+        'lastActivity': datetime.utcfromtimestamp(session['lastActivity']).isoformat(),
         'activeRequestCount': len(session['activeRequests'])
     })
 
@@ -100,7 +120,7 @@ def handle_request(session_id):
 
     # Update session activity
     session = sessions[session_id]
-    session['lastActivity'] = datetime.utcnow().isoformat()
+    session['lastActivity'] = time.time()
 
     # Get request data
     request_data = request.json
@@ -182,16 +202,24 @@ def events(client_id):
         })
         yield f"data: {data}\n\n"
 
-        # Store the client ID
-        sse_clients[client_id] = True
+        # Register the client's notification queue
+        events_queue = queue.Queue(maxsize=SSE_QUEUE_SIZE)
+        sse_clients[client_id] = events_queue
         logger.info(f"SSE client {client_id} connected")
 
         try:
-            # Keep connection alive with ping messages
+            # Deliver notifications as they arrive, pinging when idle
             keep_alive_count = 0
             while True:
-                # Sleep for 30 seconds between pings
-                time.sleep(30)
+                # Wait up to 30 seconds for the next notification
+                try:
+                    notification = events_queue.get(timeout=30)
+                except queue.Empty:
+                    notification = None
+
+                if notification is not None:
+                    yield f"data: {json.dumps(notification)}\n\n"
+                    continue
 
                 # Send ping to keep connection alive
                 keep_alive_count += 1
@@ -210,8 +238,8 @@ def events(client_id):
             # This happens when the client disconnects
             logger.info(f"SSE client {client_id} disconnected (generator exit)")
         finally:
-            # Clean up on disconnect
-            if client_id in sse_clients:
+            # Clean up on disconnect, unless a newer stream replaced this one
+            if sse_clients.get(client_id) is events_queue:
                 del sse_clients[client_id]
                 logger.info(f"SSE client {client_id} disconnected and removed from active clients")
 
@@ -223,34 +251,25 @@ def events(client_id):
     return response
 
 
-# Update send_notification function to ensure proper delivery
+# Function to send notification to a client
 def send_notification(client_id, notification):
     """Send notification to a client."""
-    if client_id in sse_clients:
-        try:
-            # In real implementation with async framework, you would use proper pub/sub
-            # This is a simplified implementation that logs the notification
-            logger.debug(f"Notification sent to client {client_id}",
-                         {'notificationType': notification.get('type')})
-
-            # In a real implementation, you would publish to the client's SSE stream here
-            # For development purposes, just log that it happened
-            return True
-        except Exception as e:
-            logger.error(f"Error sending notification to client {client_id}: {str(e)}")
-            return False
-    return False
+    events_queue = sse_clients.get(client_id)
+    if events_queue is None:
+        return False
 
+    # Hand the notification to the client's SSE stream
+    try:
+        events_queue.put_nowait(notification)
+    except queue.Full:
+        logger.warn(f"Notification queue full for client {client_id}, dropping notification")
+        return False
 
-# Function to send notification to a client
-def send_notification(client_id, notification):
-    if client_id in sse_clients:
-        # In a real implementation, this would use a proper async SSE framework
-        # For simplicity in this example, we just log it
+    # Skip building the log message when debug logging is off
+    if logger.isEnabledFor(logging.DEBUG):
         logger.debug(f"Notification sent to client {client_id}",
-                    {'notificationType': notification.get('type')})
-        return True
-    return False
+                     {'notificationType': notification.get('type')})
+    return True
 
 # SESSION CLEANUP
 
@@ -258,22 +277,38 @@ def send_notification(client_id, notification):
 def cleanup_sessions():
     while True:
         time.sleep(300)  # Check every 5 minutes
-        now = datetime.utcnow()
-        for session_id in list(sessions.keys()):
-            session = sessions[session_id]
-            last_activity = datetime.fromisoformat(session['lastActivity'])
-
+        now = time.time()
+        expired_sessions = []
+
+        # Pop only entries whose deadline has passed
+        with session_expiry_lock:
+            while session_expiry and session_expiry[0][0] <= now:
+                _, session_id = heapq.heappop(session_expiry)
+                session = sessions.get(session_id)
+                if session is None:
+                    continue  # Already closed
+
+                # Re-arm sessions that saw activity since this entry was pushed
+                deadline = session['lastActivity'] + SESSION_TIMEOUT
+                if deadline > now:
+                    heapq.heappush(session_expiry, (deadline, session_id))
+                    continue
+
+                expired_sessions.append(session_id)
+
+        for session_id in expired_sessions:
             # If the session has been inactive for more than 30 minutes
-            if (now - last_activity).total_seconds() > 1800:
-                logger.info(f"Closing inactive session {session_id}")
-                del sessions[session_id]
-
-                # Notify the client
-                send_notification(session['clientId'], {
-                    'type': 'session-expired',
-                    'sessionId': session_id,
-                    'timestamp': now.isoformat()
-                })
+            session = sessions.pop(session_id, None)
+            if session is None:
+                continue
+            logger.info(f"Closing inactive session {session_id}")
+
+            # Notify the client
+            send_notification(session['clientId'], {
+                'type': 'session-expired',
+                'sessionId': session_id,
+                'timestamp': datetime.utcnow().isoformat()
+            })
 
 # Start the cleanup thread
 cleanup_thread = threading.Thread(target=cleanup_sessions, daemon=True)
@@ -1,4 +1,5 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import sys
 import os
@@ -27,6 +28,12 @@ class RequestDispatcher:
     def __init__(self, server_urls):
         self.server_urls = server_urls
 
+        # Reuse pooled keep-alive connections to the MCP servers
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=128, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
     def dispatch(self, request):
         """Dispatch a request to the appropriate MCP server."""
         # Validate request
@@ -48,10 +55,9 @@ class RequestDispatcher:
 
         try:
             # Forward the request to the appropriate MCP server
-            response = requests.post(
+            response = self.session.post(
                 f"{server_url}/process",
                 json=request,
-                headers={'Content-Type': 'application/json'},
                 timeout=30  # 30 seconds timeout
             )
 
@@ -70,7 +76,7 @@ class RequestDispatcher:
 
         for server_id, server_url in self.server_urls.items():
             try:
-                response = requests.get(
+                response = self.session.get(
                     f"{server_url}/health",
                     timeout=5
                 )
@@ -1,95 +1,173 @@
-import json
 import threading
-import queue
+import time
+import selectors
+import socket
+import concurrent.futures
+from collections import deque
 from datetime import datetime
-import sys
-import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common.logging_utils import MCPLogger
 from common.protocol import MCPProtocol
+from common.serialization import dumps
 
 logger = MCPLogger(service_name='notifications-handler')
 
 
+# Pending notifications kept per client; the oldest are dropped beyond this
+NOTIFICATION_QUEUE_SIZE = 256
+
+# Seconds a notification queue may go undrained before reap_idle_queues drops it
+QUEUE_IDLE_TIMEOUT = 300
+
+# Number of client shards; each has its own lock (must be a power of two)
+SHARD_COUNT = 16
+
+# Frames waiting to be written for one shard; new frames are dropped beyond this
+WRITE_QUEUE_SIZE = 4096
+
+# Threads shared by all shards for socket writes
+IO_WORKERS = SHARD_COUNT
+
+
 class NotificationsHandler:
     """SSE Notifications handler for MCP."""
 
     def __init__(self):
         """Initialize the notifications handler."""
-        self.clients = {}
-        self.notification_queues = {}
-        self.lock = threading.Lock()
+        # Clients and their queues are split across shards by client ID hash,
+        # so registrations and sends for unrelated clients never contend.
+        # Only clients that poll get_client_notifications have a queue; pure
+        # SSE consumers skip the per-client copy of every notification.
+        # Each shard stores clients as parallel lists of IDs and responses
+        # (swap-removed on unregister) plus an ID -> position index, so a
+        # broadcast copies and walks two contiguous lists
+        self.shard_client_ids = [[] for _ in range(SHARD_COUNT)]
+        self.shard_responses = [[] for _ in range(SHARD_COUNT)]
+        self.shard_index = [{} for _ in range(SHARD_COUNT)]
+        self.queue_shards = [{} for _ in range(SHARD_COUNT)]
+        self.drain_shards = [{} for _ in range(SHARD_COUNT)]
+        self.shard_locks = [threading.Lock() for _ in range(SHARD_COUNT)]
+
+        # Connected client count, maintained by register/unregister so reads
+        # never walk the shards
+        self._client_count = 0
+        self._count_lock = threading.Lock()
+
+        # Producers only enqueue frames; a drain task on the shared I/O pool
+        # writes a shard's queue while it is non-empty, so shards are written
+        # in parallel and frames for one client stay in order
+        self._write_queues = [deque() for _ in range(SHARD_COUNT)]
+        self._draining = [False] * SHARD_COUNT
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=IO_WORKERS, thread_name_prefix='notifications-io'
+        )
+
+        # Client sockets watched for hang-ups, so broadcasts skip dead clients
+        # instead of discovering them through failed writes
+        self._selector = selectors.DefaultSelector()
+        self._selector_lock = threading.Lock()
+
+    def _shard(self, client_id):
+        """Get the index of the shard that owns a client."""
+        return hash(client_id) & (SHARD_COUNT - 1)
 
     def register_client(self, client_id, response):
         """Register a client for notifications."""
-        with self.lock:
-            # Create notification queue for this client
-            self.notification_queues[client_id] = queue.Queue()
-
+        shard = self._shard(client_id)
+        with self.shard_locks[shard]:
             # Store the client connection
-            self.clients[client_id] = response
-
-            logger.info(f"Client {client_id} registered for notifications")
-
-            # Send initial connection message
-            initial_notification = MCPProtocol.create_notification(
-                'connected',
-                {
-                    'clientId': client_id,
-                    'timestamp': datetime.utcnow().isoformat()
-                },
-                source='session-manager'
-            )
+            index = self.shard_index[shard]
+            position = index.get(client_id)
+            previous_response = None
+            if position is not None:
+                previous_response = self.shard_responses[shard][position]
+                self.shard_responses[shard][position] = response
+            else:
+                index[client_id] = len(self.shard_client_ids[shard])
+                self.shard_client_ids[shard].append(client_id)
+                self.shard_responses[shard].append(response)
+                with self._count_lock:
+                    self._client_count += 1
+
+        if previous_response is not None:
+            self._unwatch_socket(previous_response)
+        self._watch_socket(client_id, response)
+
+        logger.info(f"Client {client_id} registered for notifications")
+
+        # Send initial connection message
+        initial_notification = MCPProtocol.create_notification(
+            'connected',
+            {
+                'clientId': client_id,
+                'timestamp': datetime.utcnow().isoformat()
+            },
+            source='session-manager'
+        )
 
-            self._send_event(response, initial_notification)
+        self._enqueue_frame(shard, client_id, response, self._encode_event(initial_notification))
 
     def unregister_client(self, client_id):
         """Unregister a client."""
-        with self.lock:
-            if client_id in self.clients:
-                del self.clients[client_id]
+        shard = self._shard(client_id)
+        with self.shard_locks[shard]:
+            index = self.shard_index[shard]
+            position = index.pop(client_id, None)
+            if position is None:
+                return False
 
-                if client_id in self.notification_queues:
-                    del self.notification_queues[client_id]
+            # Swap-remove: move the last client into the vacated slot
+            client_ids = self.shard_client_ids[shard]
+            responses = self.shard_responses[shard]
+            response = responses[position]
+            last_id = client_ids.pop()
+            last_response = responses.pop()
+            if last_id != client_id:
+                client_ids[position] = last_id
+                responses[position] = last_response
+                index[last_id] = position
 
-                logger.info(f"Client {client_id} unregistered from notifications")
-                return True
-            return False
+            self.queue_shards[shard].pop(client_id, None)
+            self.drain_shards[shard].pop(client_id, None)
+            with self._count_lock:
+                self._client_count -= 1
+
+        self._unwatch_socket(response)
+
+        logger.info(f"Client {client_id} unregistered from notifications")
+        return True
 
     def send_notification(self, client_id, notification_data):
         """Send a notification to a client."""
-        with self.lock:
-            if client_id not in self.clients:
-                logger.debug(f"Cannot send notification: client {client_id} not registered")
-                return False
+        shard = self._shard(client_id)
+        with self.shard_locks[shard]:
+            # Get the client's response object and queue
+            position = self.shard_index[shard].get(client_id)
+            response = None if position is None else self.shard_responses[shard][position]
+            client_queue = self.queue_shards[shard].get(client_id)
+
+        if response is None:
+            logger.debug(f"Cannot send notification: client {client_id} not registered")
+            return False
 
-            # Get the client's response object
-            response = self.clients[client_id]
+        # Create notification using protocol
+        notification = MCPProtocol.create_notification(
+            notification_data.get('type', 'event'),
+            notification_data,
+            source='session-manager'
+        )
 
-            # Create notification using protocol
-            notification = MCPProtocol.create_notification(
-                notification_data.get('type', 'event'),
-                notification_data,
-                source='session-manager'
-            )
+        # Add to the client's notification queue
+        if client_queue is not None:
+            client_queue.append(notification)
 
-            try:
-                # Add to the client's notification queue
-                if client_id in self.notification_queues:
-                    self.notification_queues[client_id].put(notification)
+        # Hand the frame to the shard's drain task
+        if not self._enqueue_frame(shard, client_id, response, self._encode_event(notification)):
+            return False
 
-                # Send directly to client
-                self._send_event(response, notification)
-
-                logger.debug(f"Notification sent to client {client_id}",
-                             {'type': notification_data.get('type')})
-                return True
-            except Exception as e:
-                logger.error(f"Error sending notification to client {client_id}: {str(e)}")
-                # Client connection might be broken, unregister
-                self.unregister_client(client_id)
-                return False
+        logger.debug(f"Notification sent to client {client_id}",
+                     {'type': notification_data.get('type')})
+        return True
 
     def broadcast_notification(self, notification_data):
         """Broadcast a notification to all clients."""
@@ -100,22 +178,29 @@ class NotificationsHandler:
             source='session-manager'
         )
 
+        # Encode the SSE frame once for every recipient
+        frame = self._encode_event(notification)
+
+        # Drop clients that have hung up before queueing writes to them
+        self._prune_closed_clients()
+
         sent_count = 0
 
-        with self.lock:
-            for client_id, response in list(self.clients.items()):
-                try:
-                    # Add to client's notification queue
-                    if client_id in self.notification_queues:
-                        self.notification_queues[client_id].put(notification)
+        for shard in range(SHARD_COUNT):
+            # Snapshot the shard under its lock, then enqueue without holding it
+            with self.shard_locks[shard]:
+                client_ids = list(self.shard_client_ids[shard])
+                responses = list(self.shard_responses[shard])
+                client_queues = list(self.queue_shards[shard].values())
+
+            # Add to the notification queues of clients that poll
+            for client_queue in client_queues:
+                client_queue.append(notification)
 
-                    # Send to client
-                    self._send_event(response, notification)
+            # Hand the frame to the shard's drain task
+            for client_id, response in zip(client_ids, responses):
+                if self._enqueue_frame(shard, client_id, response, frame):
                     sent_count += 1
-                except Exception as e:
-                    logger.error(f"Error broadcasting to client {client_id}: {str(e)}")
-                    # Client connection might be broken, unregister
-                    self.unregister_client(client_id)
 
         logger.info(f"Broadcast notification sent to {sent_count} clients",
                     {'type': notification_data.get('type')})
@@ -123,26 +208,175 @@ class NotificationsHandler:
         return sent_count
 
     def get_client_notifications(self, client_id, max_count=None):
-        """Get pending notifications for a client."""
-        if client_id not in self.notification_queues:
-            return []
+        """Get pending notifications for a client.
+
+        The first call enables queueing for the client; notifications sent
+        before then are delivered over SSE only.
+        """
+        shard = self._shard(client_id)
+        with self.shard_locks[shard]:
+            if client_id not in self.shard_index[shard]:
+                return []
+
+            # Start queueing on first poll, or again after the queue was reaped
+            q = self.queue_shards[shard].get(client_id)
+            if q is None:
+                q = self.queue_shards[shard][client_id] = deque(maxlen=NOTIFICATION_QUEUE_SIZE)
+            self.drain_shards[shard][client_id] = time.monotonic()
+
+        # Get notifications up to max_count (or all if max_count is None);
+        # popleft is atomic, so no lock is needed against concurrent appends
+        count = len(q) if max_count is None else min(len(q), max_count)
+        return [q.popleft() for _ in range(count)]
+
+    def reap_idle_queues(self, idle_seconds=QUEUE_IDLE_TIMEOUT):
+        """Drop notification queues not drained within idle_seconds.
+
+        Called from SessionManager.cleanup_inactive_sessions when the manager
+        is given this handler; clients stay registered and keep receiving
+        SSE frames.
+        """
+        cutoff = time.monotonic() - idle_seconds
+        reaped = 0
+
+        for shard in range(SHARD_COUNT):
+            with self.shard_locks[shard]:
+                queues = self.queue_shards[shard]
+                drains = self.drain_shards[shard]
+                for client_id in [cid for cid, drained in drains.items() if drained < cutoff]:
+                    del drains[client_id]
+                    if queues.pop(client_id, None) is not None:
+                        reaped += 1
+
+        if reaped:
+            logger.info(f"Reaped {reaped} idle notification queues")
+        return reaped
+
+    def _encode_event(self, data):
+        """Encode data as a compact SSE event frame."""
+        return b"data: " + dumps(data) + b"\n\n"
+
+    def _enqueue_frame(self, shard, client_id, response, frame):
+        """Queue a frame for a shard's drain task; False if the queue is full."""
+        write_queue = self._write_queues[shard]
+        if len(write_queue) >= WRITE_QUEUE_SIZE:
+            logger.warn(f"Write queue full for client {client_id}, dropping notification")
+            return False
+
+        write_queue.append((client_id, response, frame))
+
+        # Start a drain task unless one is already running for this shard
+        with self.shard_locks[shard]:
+            if self._draining[shard]:
+                return True
+            self._draining[shard] = True
+
+        self._io_pool.submit(self._drain_shard, shard)
+        return True
+
+    def _drain_shard(self, shard):
+        """Write queued frames for one shard until its queue is empty."""
+        write_queue = self._write_queues[shard]
+
+        while True:
+            while write_queue:
+                client_id, response, frame = write_queue.popleft()
+
+                # Skip frames for clients that disconnected after they were queued
+                if not self._is_current(shard, client_id, response):
+                    continue
+
+                try:
+                    self._send_event(response, frame)
+                except Exception as e:
+                    logger.error(f"Error sending notification to client {client_id}: {str(e)}")
+                    # Client connection might be broken, unregister
+                    self.unregister_client(client_id)
+
+            # Frames enqueued after the last pop are picked up before exiting
+            with self.shard_locks[shard]:
+                if not write_queue:
+                    self._draining[shard] = False
+                    return
+
+    def _is_current(self, shard, client_id, response):
+        """Check that a client is still registered with the given response."""
+        with self.shard_locks[shard]:
+            position = self.shard_index[shard].get(client_id)
+            return position is not None and self.shard_responses[shard][position] is response
+
+    def _watch_socket(self, client_id, response):
+        """Watch a client's socket for hang-ups, if the response exposes one."""
+        sock = self._socket_for(response)
+        if sock is None:
+            return
+
+        with self._selector_lock:
+            try:
+                self._selector.register(sock, selectors.EVENT_READ, (client_id, response))
+            except (KeyError, ValueError, OSError):
+                # Already watched, or the socket is already closed
+                pass
+
+    def _unwatch_socket(self, response):
+        """Stop watching the socket behind a response."""
+        sock = self._socket_for(response)
+        if sock is None:
+            return
+
+        with self._selector_lock:
+            try:
+                self._selector.unregister(sock)
+            except (KeyError, ValueError, OSError):
+                pass
+
+    def _prune_closed_clients(self):
+        """Unregister clients whose sockets have hung up.
+
+        SSE clients never send after their request, so a socket that polls
+        readable is at EOF or in error; a zero-timeout select finds them all
+        in one call, without attempting (and failing) a write to each.
+        """
+        with self._selector_lock:
+            events = self._selector.select(timeout=0)
+
+        closed = []
+        for key, _ in events:
+            try:
+                if key.fileobj.recv(1, socket.MSG_PEEK) == b'':
+                    closed.append(key.data)
+            except OSError:
+                closed.append(key.data)
+
+        for client_id, response in closed:
+            # Skip clients that re-registered with a new connection meanwhile
+            if self._is_current(self._shard(client_id), client_id, response):
+                self.unregister_client(client_id)
+            else:
+                self._unwatch_socket(response)
 
-        notifications = []
-        q = self.notification_queues[client_id]
+        return len(closed)
 
-        # Get notifications up to max_count (or all if max_count is None)
-        count = 0
-        while not q.empty() and (max_count is None or count < max_count):
-            notifications.append(q.get())
-            count += 1
+    def _socket_for(self, response):
+        """Get the raw socket behind a response, if the server exposes one."""
+        return getattr(response, 'socket', None) or getattr(response, '_sock', None)
 
-        return notifications
+    def _send_event(self, response, frame):
+        """Send a pre-encoded SSE event frame to the client.
 
-    def _send_event(self, response, data):
-        """Send an SSE event to the client."""
+        When the response wraps a raw socket the frame goes out in a single
+        sendmsg call; otherwise it is written and flushed through the response.
+        """
         try:
-            event_data = f"data: {json.dumps(data)}\n\n"
-            response.write(event_data)
+            sock = self._socket_for(response)
+            if sock is not None:
+                sent = sock.sendmsg([frame])
+                if sent < len(frame):
+                    # Finish a partial send from a view, without copying the tail
+                    sock.sendall(memoryview(frame)[sent:])
+                return
+
+            response.write(frame)
             response.flush()
         except Exception as e:
             logger.error(f"Error sending SSE event: {str(e)}")
@@ -150,8 +384,8 @@ class NotificationsHandler:
 
     def get_client_count(self):
         """Get the number of connected clients."""
-        return len(self.clients)
+        return self._client_count
 
     def is_client_connected(self, client_id):
         """Check if a client is connected."""
-        return client_id in self.clients
\ No newline at end of file
+        return client_id in self.shard_index[self._shard(client_id)]
\ No newline at end of file
@@ -1,37 +1,50 @@
-import uuid
-from datetime import datetime
-import sys
+import time
+import heapq
+from collections import defaultdict
+from datetime import datetime, timedelta
 import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from common.logging_utils import MCPLogger
+from common.serialization import dumps
 
 logger = MCPLogger(service_name='session-manager')
 
+# Clock functions bound once, skipping attribute lookups in hot paths
+_utcnow = datetime.utcnow
+_monotonic = time.monotonic
+
 
 class Session:
     """Session management for MCP."""
 
+    __slots__ = ('id', 'client_id', 'created', 'last_activity', 'active_requests',
+                 'metadata', '_created_iso', '_last_activity_iso')
+
     def __init__(self, session_id, client_id):
         """Initialize a new session."""
         self.id = session_id
         self.client_id = client_id
-        self.created = datetime.utcnow()
-        self.last_activity = datetime.utcnow()
+        self.created = _utcnow()
+        self.last_activity = _monotonic()
         self.active_requests = {}
+
+        # ISO strings for get_info; last activity is re-formatted only after it changes
+        self._created_iso = self.created.isoformat()
+        self._last_activity_iso = None
         self.metadata = {}
 
     @classmethod
     def create(cls, client_id):
         """Create a new session with a unique ID."""
-        session_id = str(uuid.uuid4())
+        # 128 random bits as an opaque hex ID, without building a UUID object
+        session_id = os.urandom(16).hex()
         logger.info(f"Creating new session {session_id} for client {client_id}")
         return cls(session_id, client_id)
 
     def add_request(self, request_id, request):
         """Add an active request to the session."""
         self.active_requests[request_id] = {
-            'timestamp': datetime.utcnow(),
+            'timestamp': _monotonic(),
             'request': request
         }
         self.update_activity()
@@ -48,24 +61,33 @@ class Session:
 
     def update_activity(self):
         """Update the last activity timestamp."""
-        self.last_activity = datetime.utcnow()
+        self.last_activity = _monotonic()
+        self._last_activity_iso = None
 
     def is_inactive(self, timeout_seconds=1800):
         """Check if the session has been inactive for a period."""
-        inactive_time = (datetime.utcnow() - self.last_activity).total_seconds()
-        return inactive_time > timeout_seconds
+        return _monotonic() - self.last_activity > timeout_seconds
 
     def get_info(self):
         """Get session information."""
+        if self._last_activity_iso is None:
+            # last_activity is monotonic; convert it to wall-clock time for display
+            last_activity = _utcnow() - timedelta(seconds=_monotonic() - self.last_activity)
+            self._last_activity_iso = last_activity.isoformat()
+
         return {
             'id': self.id,
             'clientId': self.client_id,
-            'created': self.created.isoformat(),
-            'lastActivity': self.last_activity.isoformat(),
+            'created': self._created_iso,
+            'lastActivity': self._last_activity_iso,
             'activeRequestCount': len(self.active_requests),
             'metadata': self.metadata
         }
 
+    def to_json(self):
+        """Get session information encoded as JSON bytes."""
+        return dumps(self.get_info())
+
     def set_metadata(self, key, value):
         """Set metadata value."""
         self.metadata[key] = value
@@ -79,14 +101,29 @@ class Session:
 class SessionManager:
     """Manager for multiple MCP sessions."""
 
-    def __init__(self):
-        """Initialize the session manager."""
+    def __init__(self, notifications=None):
+        """Initialize the session manager.
+
+        When a NotificationsHandler is given, each cleanup pass also reaps
+        its notification queues that clients stopped draining.
+        """
         self.sessions = {}
+        self.notifications = notifications
+
+        # Session IDs per client, so client lookups skip a full scan
+        self._by_client = defaultdict(set)
+
+        # Min-heap of (last_activity, session_id), one entry per session.
+        # Entries go stale when a session sees newer activity and are
+        # re-armed with the current value when popped.
+        self._activity_heap = []
 
     def create_session(self, client_id):
         """Create a new session."""
         session = Session.create(client_id)
         self.sessions[session.id] = session
+        self._by_client[client_id].add(session.id)
+        heapq.heappush(self._activity_heap, (session.last_activity, session.id))
         return session
 
     def get_session(self, session_id):
@@ -95,32 +132,53 @@ class SessionManager:
 
     def close_session(self, session_id):
         """Close and remove a session."""
-        if session_id in self.sessions:
-            logger.info(f"Closing session {session_id}")
-            del self.sessions[session_id]
-            return True
-        return False
+        session = self.sessions.get(session_id)
+        if session is None:
+            return False
+
+        logger.info(f"Closing session {session_id}")
+        client_sessions = self._by_client.get(session.client_id)
+        if client_sessions is not None:
+            client_sessions.discard(session_id)
+            if not client_sessions:
+                del self._by_client[session.client_id]
+
+        del self.sessions[session_id]
+        return True
 
     def cleanup_inactive_sessions(self, timeout_seconds=1800):
         """Clean up inactive sessions."""
         inactive_sessions = []
+        cutoff = _monotonic() - timeout_seconds
+
+        # Pop only entries older than the cutoff instead of scanning every session
+        while self._activity_heap and self._activity_heap[0][0] < cutoff:
+            _, session_id = heapq.heappop(self._activity_heap)
+            session = self.sessions.get(session_id)
+            if session is None:
+                continue
 
-        for session_id, session in self.sessions.items():
-            if session.is_inactive(timeout_seconds):
+            if session.last_activity < cutoff:
                 inactive_sessions.append(session_id)
+            else:
+                heapq.heappush(self._activity_heap, (session.last_activity, session_id))
 
         for session_id in inactive_sessions:
             client_id = self.sessions[session_id].client_id
             self.close_session(session_id)
             logger.info(f"Closed inactive session {session_id} for client {client_id}")
 
+        # Piggyback notification queue housekeeping on the same pass
+        if self.notifications is not None:
+            self.notifications.reap_idle_queues()
+
         return len(inactive_sessions)
 
     def get_client_sessions(self, client_id):
         """Get all sessions for a client."""
         return {
-            session_id: session for session_id, session in self.sessions.items()
-            if session.client_id == client_id
+            session_id: self.sessions[session_id]
+            for session_id in self._by_client.get(client_id, ())
         }
 
     def get_session_count(self):